@@ -66,6 +66,9 @@ class ChatCLI:
     def register_handler(self, cmd_type: CommandType, handler: Callable) -> None:
         self._handlers[cmd_type] = handler
     
+    def register_handlers(self, handlers: Dict[CommandType, Callable]) -> None:
+        self._handlers.update(handlers)
+    
     def print_banner(self) -> None:
         banner = f"""
 {Color.CYAN}{'═' * 55}
@@ -120,6 +123,20 @@ class ChatCLI:
             if self._running:
                 print(self.PROMPT, end='', flush=True)
     
+    def print_system_lines(self, messages: list) -> None:
+        prefix = f"\r{Color.YELLOW}[System]{Color.RESET} "
+        with self._input_lock:
+            print("\n".join(prefix + message for message in messages))
+            if self._running:
+                print(self.PROMPT, end='', flush=True)
+    
+    def print_discovery_lines(self, messages: list) -> None:
+        prefix = f"\r{Color.MAGENTA}[Discovery]{Color.RESET} "
+        with self._input_lock:
+            print("\n".join(prefix + message for message in messages))
+            if self._running:
+                print(self.PROMPT, end='', flush=True)
+    
     def print_connection(self, message: str) -> None:
         with self._input_lock:
             print(f"\r{Color.BLUE}[Connection]{Color.RESET} {message}")
@@ -1,4 +1,5 @@
 import socket
+import sys
 import threading
 from typing import Dict, Callable, Optional, Tuple
 import logging
@@ -62,6 +63,9 @@ class PeerConnection:
         self._receive_thread.start()
     
     def send_message(self, content: str) -> bool:
+        return self.send_frame(create_chat_message("", content).to_framed_bytes())
+    
+    def send_frame(self, data: bytes) -> bool:
         if not self._connected:
             return False
         
@@ -69,8 +73,6 @@ class PeerConnection:
             return False
         
         try:
-            msg = create_chat_message("", content)
-            data = msg.to_bytes() + b'\n'
             self.socket.sendall(data)
             return True
         except Exception as e:
@@ -84,27 +86,33 @@ class PeerConnection:
         
         try:
             msg = create_disconnect_message("")
-            self.socket.sendall(msg.to_bytes() + b'\n')
+            self.socket.sendall(msg.to_framed_bytes())
         except Exception:
             pass
         
         self._handle_disconnect()
     
     def _receive_loop(self) -> None:
-        buffer = ""
+        chunk = memoryview(bytearray(self.BUFFER_SIZE))
+        buffer = bytearray()
         
         while self._connected:
             try:
-                data = self.socket.recv(self.BUFFER_SIZE)
-                if not data:
+                received = self.socket.recv_into(chunk)
+                if not received:
                     break
                 
-                buffer += data.decode('utf-8')
+                buffer += chunk[:received]
                 
-                while '\n' in buffer:
-                    msg_str, buffer = buffer.split('\n', 1)
-                    if msg_str:
-                        self._process_message(msg_str)
+                start = 0
+                end = buffer.find(b'\n')
+                while end >= 0:
+                    if end > start:
+                        self._process_message(buffer[start:end].decode('utf-8'))
+                    start = end + 1
+                    end = buffer.find(b'\n', start)
+                if start:
+                    del buffer[:start]
                         
             except socket.timeout:
                 continue
@@ -174,7 +182,8 @@ class ConnectionManager:
         self.local_ip = local_ip
         self.port = port
         
-        self._connections: Dict[str, list] = {}
+        self._connections: Dict[str, Tuple[PeerConnection, ...]] = {}
+        self._connections_lock = threading.Lock()
         self._server_socket: Optional[socket.socket] = None
         self._accepting = False
         self._accept_thread: Optional[threading.Thread] = None
@@ -186,17 +195,21 @@ class ConnectionManager:
     @property
     def connected_peers(self) -> list:
         return list(self._connections.keys())
+    
+    def is_connected(self, ip: str) -> bool:
+        return ip in self._connections
 
     def get_connection(self, ip: str, port: int = None) -> Optional[PeerConnection]:
-        if ip not in self._connections:
+        conns = self._connections.get(ip)
+        if not conns:
             return None
         
         if port is not None:
-            for conn in self._connections[ip]:
+            for conn in conns:
                 if conn.peer_port == port:
                     return conn
         
-        return self._connections[ip][-1] if self._connections[ip] else None
+        return conns[-1]
     
     def set_message_callback(self, callback: Callable[[str, int, Message], None]) -> None:
         self._on_message = callback
@@ -212,7 +225,7 @@ class ConnectionManager:
             self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self._server_socket.bind(('', self.port))
-            self._server_socket.listen(5)
+            self._server_socket.listen(socket.SOMAXCONN)
             self._server_socket.settimeout(1.0)
             
             self._accepting = True
@@ -266,16 +279,15 @@ class ConnectionManager:
     
 
     def is_peer_approved(self, peer_ip: str) -> bool:
-        if peer_ip in self._connections:
-            return any(c.is_approved for c in self._connections[peer_ip])
-        return False
+        return any(c.is_approved for c in self._connections.get(peer_ip, ()))
 
     def accept_connection(self, peer_ip: str) -> bool:
-        if peer_ip not in self._connections:
+        conns = self._connections.get(peer_ip)
+        if conns is None:
             return False
         
         target_conn = None
-        for conn in self._connections[peer_ip]:
+        for conn in conns:
             if not conn.is_approved:
                 target_conn = conn
                 break
@@ -287,7 +299,7 @@ class ConnectionManager:
             
         try:
             msg = create_connection_accept("")
-            target_conn.socket.sendall(msg.to_bytes() + b'\n')
+            target_conn.socket.sendall(msg.to_framed_bytes())
             
             target_conn.is_approved = True
             logger.info(f"Accepted connection from {peer_ip}")
@@ -297,15 +309,16 @@ class ConnectionManager:
             return False
 
     def reject_connection(self, peer_ip: str) -> None:
-        if peer_ip not in self._connections:
+        conns = self._connections.get(peer_ip)
+        if conns is None:
             return
             
         try:
-            for conn in self._connections[peer_ip]:
+            frame = create_connection_reject("").to_framed_bytes()
+            for conn in conns:
                 if not conn.is_approved:
-                    msg = create_connection_reject("")
                     try:
-                        conn.socket.sendall(msg.to_bytes() + b'\n')
+                        conn.socket.sendall(frame)
                     except Exception:
                         pass
         except Exception:
@@ -314,11 +327,10 @@ class ConnectionManager:
         self.disconnect_peer(peer_ip)
 
     def connect_to_peer(self, peer_ip: str, peer_port: int = 5000) -> bool:
-        if peer_ip in self._connections:
-            for conn in self._connections[peer_ip]:
-                if conn.peer_port == peer_port:
-                    logger.warning(f"Already connected to {peer_ip}:{peer_port}")
-                    return True
+        for conn in self._connections.get(peer_ip, ()):
+            if conn.peer_port == peer_port:
+                logger.warning(f"Already connected to {peer_ip}:{peer_port}")
+                return True
         
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -335,29 +347,38 @@ class ConnectionManager:
             logger.error(f"Could not connect to {peer_ip}:{peer_port}: {e}")
             return False
     
-    def disconnect_peer(self, peer_ip: str) -> None:
-        if peer_ip in self._connections:
-            for conn in list(self._connections[peer_ip]):
-                conn.disconnect()
-            
+    def disconnect_peer(self, peer_ip: str) -> bool:
+        conns = self._connections.get(peer_ip)
+        if conns is None:
+            return False
+        
+        for conn in conns:
+            conn.disconnect()
+        
+        with self._connections_lock:
             if peer_ip in self._connections:
-                del self._connections[peer_ip]
+                connections = dict(self._connections)
+                del connections[peer_ip]
+                self._connections = connections
+        return True
     
     def send_to_peer(self, peer_ip: str, content: str) -> bool:
-        if peer_ip not in self._connections:
+        conns = self._connections.get(peer_ip)
+        if conns is None:
             return False
         
         sent = False
-        for conn in self._connections[peer_ip]:
+        for conn in conns:
             if conn.send_message(content):
                 sent = True
         return sent
     
     def broadcast_message(self, content: str) -> int:
+        frame = create_chat_message("", content).to_framed_bytes()
         count = 0
         for peer_list in self._connections.values():
             for conn in peer_list:
-                if conn.send_message(content):
+                if conn.send_frame(frame):
                     count += 1
         return count
     
@@ -367,6 +388,7 @@ class ConnectionManager:
         peer_port: int,
         sock: socket.socket
     ) -> PeerConnection:
+        peer_ip = sys.intern(peer_ip)
         conn = PeerConnection(
             peer_ip=peer_ip,
             peer_port=peer_port,
@@ -375,9 +397,10 @@ class ConnectionManager:
             on_disconnect=self._handle_peer_disconnect
         )
         
-        if peer_ip not in self._connections:
-            self._connections[peer_ip] = []
-        self._connections[peer_ip].append(conn)
+        with self._connections_lock:
+            connections = dict(self._connections)
+            connections[peer_ip] = connections.get(peer_ip, ()) + (conn,)
+            self._connections = connections
         
         conn.start_receiving()
         
@@ -387,22 +410,20 @@ class ConnectionManager:
         return conn
     
     def _handle_peer_disconnect(self, peer_ip: str, peer_port: int) -> None:
-        if peer_ip in self._connections:
-            approved_disconnect = False
-            disconnected_port = peer_port
+        with self._connections_lock:
+            conns = self._connections.get(peer_ip)
+            if conns is None:
+                return
             
-            for i in range(len(self._connections[peer_ip]) - 1, -1, -1):
-                conn = self._connections[peer_ip][i]
-                if not conn.is_connected:
-                    if conn.is_approved:
-                        approved_disconnect = True
-                        disconnected_port = conn.peer_port
-                    self._connections[peer_ip].pop(i)
+            remaining = tuple(c for c in conns if c.is_connected)
+            approved = [c for c in conns if not c.is_connected and c.is_approved]
             
-            if not self._connections[peer_ip]:
-                del self._connections[peer_ip]
-                
-                if approved_disconnect and self._on_peer_disconnected:
-                    self._on_peer_disconnected(peer_ip, disconnected_port)
-            elif approved_disconnect:
-                pass
+            connections = dict(self._connections)
+            if remaining:
+                connections[peer_ip] = remaining
+            else:
+                del connections[peer_ip]
+            self._connections = connections
+        
+        if not remaining and approved and self._on_peer_disconnected:
+            self._on_peer_disconnected(peer_ip, approved[0].peer_port)
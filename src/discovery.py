@@ -70,9 +70,10 @@ class PeerDiscovery:
             except Exception:
                 pass
             
+            packet = msg.to_bytes()
             for target in targets:
                 try:
-                    sock.sendto(msg.to_bytes(), (target, self.broadcast_port))
+                    sock.sendto(packet, (target, self.broadcast_port))
                 except Exception as e:
                     logger.debug(f"Failed to send to {target}: {e}")
             
@@ -101,30 +102,13 @@ class PeerDiscovery:
             logger.debug(f"Received discovery response from {peer_ip}: {msg}")
             
             if msg.msg_type == MessageType.DISCOVERY_RESPONSE:
-                payload_parts = msg.payload.split(':')
-                
-                peer_username = "Unknown"
-                peer_tcp_port = 5000
+                head, sep, port_str = msg.payload.rpartition(':')
+                try:
+                    peer_tcp_port = int(port_str)
+                except ValueError:
+                    return
                 
-                if len(payload_parts) == 3:
-                    peer_username = payload_parts[1]
-                    try:
-                        peer_tcp_port = int(payload_parts[2])
-                    except ValueError:
-                        return
-                        
-                elif len(payload_parts) == 2:
-                    peer_username = payload_parts[0]
-                    try:
-                         peer_tcp_port = int(payload_parts[1])
-                    except ValueError:
-                         return
-                         
-                elif len(payload_parts) == 1:
-                    try:
-                        peer_tcp_port = int(payload_parts[0])
-                    except ValueError:
-                        return
+                peer_username = head.rpartition(':')[2] if sep else "Unknown"
                 
                 if peer_ip == self.local_ip and peer_tcp_port == self.tcp_port:
                     return
@@ -208,24 +192,10 @@ class PeerDiscovery:
             peer_ip = addr[0]
             
             if msg.msg_type == MessageType.DISCOVERY:
-                sender_tcp_port = 0
-                parts = msg.payload.split(':')
-                
-                if len(parts) == 3:
-                     try:
-                         sender_tcp_port = int(parts[2])
-                     except ValueError:
-                         pass
-                elif len(parts) == 2:
-                     try:
-                         sender_tcp_port = int(parts[1])
-                     except ValueError:
-                         pass
-                elif len(parts) == 1:
-                     try:
-                         sender_tcp_port = int(parts[0])
-                     except ValueError:
-                         pass
+                try:
+                    sender_tcp_port = int(msg.payload.rpartition(':')[2])
+                except ValueError:
+                    sender_tcp_port = 0
                 
                 if peer_ip == self.local_ip and sender_tcp_port == self.tcp_port:
                     return
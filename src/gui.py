@@ -1,9 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+import queue
 import threading
-from typing import Optional, Set, Tuple
+from collections import deque, namedtuple
+from typing import Dict, List, Optional, Set, Tuple
 import socket
 
+from .protocol import Message, MessageType
+
+
+PeerRow = namedtuple('PeerRow', 'ip port username label')
+
 
 class P2PChatGUI:
     
@@ -22,6 +29,23 @@ class P2PChatGUI:
         'border': '#333333'
     }
     
+    FONTS = {
+        'title': ('Segoe UI', 14, 'bold'),
+        'header': ('Segoe UI', 12, 'bold'),
+        'input': ('Segoe UI', 11),
+        'main': ('Segoe UI', 10),
+        'main_bold': ('Segoe UI', 10, 'bold'),
+        'small': ('Segoe UI', 9),
+        'small_bold': ('Segoe UI', 9, 'bold'),
+        'mono': ('Consolas', 10)
+    }
+    
+    SCROLL_UPDATE_MS = 16
+    UI_DRAIN_INTERVAL_MS = 16
+    UI_DRAIN_BATCH = 100
+    MAX_CHAT_LINES = 2000
+    CHAT_TRIM_SLACK = 200
+    
     def __init__(self, peer, username="User"):
         self.peer = peer
         self.username = username
@@ -31,23 +55,75 @@ class P2PChatGUI:
         self.root.minsize(640, 360)
         self.root.configure(bg=self.COLORS['bg_dark'])
         
-        self.pending_requests: Set[Tuple[str, int, str]] = set()
-        self.all_discovered_peers: Set[Tuple[str, int, str]] = set()
-        self.approved_peer_info: Set[Tuple[str, int, str]] = set()
+        self.pending_requests: Dict[Tuple[str, int, str], int] = {}
+        self._current_pending: Optional[Tuple[str, int, str]] = None
+        self._pending_rendered: Optional[Tuple[str, int, str]] = None
+        self.all_discovered_peers: Dict[Tuple[str, int], PeerRow] = {}
+        self.approved_peer_info: Dict[Tuple[str, int], str] = {}
+        self._peer_by_ip: Dict[str, int] = {}
+        self._display_name_cache: Dict[Tuple[str, Optional[int]], str] = {}
         self.ephemeral_to_listening: dict = {}
+        self._connected_rows: List[PeerRow] = []
+        self._discovered_index: List[PeerRow] = []
+        self._discovered_version = 0
+        self._approved_version = 0
+        self._last_filter_key = None
+        self._connected_version = None
+        self._log_queue: deque = deque()
+        self._log_flush_scheduled = False
+        self._connected_dirty = False
+        self._pending_dirty = False
+        self._scroll_dirty = False
+        self._scrollbar_visible = False
+        self._canvas_window_size = (None, None)
+        self._wheel_accum = 0
+        self._wheel_pending = False
+        self._io_queue: queue.Queue = queue.Queue()
+        self._scan_queue: queue.Queue = queue.Queue()
+        self._ui_queue: queue.SimpleQueue = queue.SimpleQueue()
         
         self._setup_styles()
         self._build_ui()
         self._setup_callbacks()
+        threading.Thread(target=self._io_worker, args=(self._io_queue,), daemon=True).start()
+        threading.Thread(target=self._io_worker, args=(self._scan_queue,), daemon=True).start()
+        self.root.after(self.UI_DRAIN_INTERVAL_MS, self._drain_ui_queue)
         self._start_peer()
 
     def _filter_peers(self):
-        self.discovered_listbox.delete(0, tk.END)
-        
-        for ip, port, username in self.all_discovered_peers:
-            if (ip, port, username) not in self.approved_peer_info:
-                display_text = f"{username} [{ip}:{port}]"
-                self.discovered_listbox.insert(tk.END, display_text)
+        filter_key = (self._discovered_version, self._approved_version)
+        if filter_key == self._last_filter_key:
+            return
+        self._last_filter_key = filter_key
+        
+        peers = [
+            row for endpoint, row in sorted(self.all_discovered_peers.items())
+            if self.approved_peer_info.get(endpoint) != row.username
+        ]
+        shown = self._discovered_index
+        listbox = self.discovered_listbox
+        
+        selection = listbox.curselection()
+        selected = shown[selection[0]] if selection else None
+        
+        limit = min(len(peers), len(shown))
+        start = 0
+        while start < limit and peers[start] == shown[start]:
+            start += 1
+        tail = 0
+        while tail < limit - start and peers[-1 - tail] == shown[-1 - tail]:
+            tail += 1
+        
+        if start + tail < len(shown):
+            listbox.delete(start, len(shown) - tail - 1)
+        if start + tail < len(peers):
+            listbox.insert(start, *(row.label for row in peers[start:len(peers) - tail]))
+        
+        self._discovered_index = peers
+        
+        if selected is not None and selected in peers:
+            listbox.selection_clear(0, tk.END)
+            listbox.selection_set(peers.index(selected))
 
     def _on_search_peers(self, event):
         self._filter_peers()
@@ -57,35 +133,22 @@ class P2PChatGUI:
         if not selection:
             return
             
-        item_text = self.connected_listbox.get(selection[0])
-        
-        if '[' in item_text and ']' in item_text:
-            bracket_content = item_text[item_text.index('[')+1:item_text.index(']')]
-            peer_ip = bracket_content.split(':')[0]
-        else:
-            parts = item_text.split()
-            if len(parts) >= 2:
-                peer_ip = parts[1]
-            else:
-                return
-        
+        peer_ip = self._connected_rows[selection[0]].ip
         self.peer.connections.disconnect_peer(peer_ip)
     
     def _setup_styles(self):
-        style = ttk.Style()
+        style = ttk.Style(self.root)
+        if style.lookup('Action.TButton', 'padding'):
+            return
         style.theme_use('clam')
         
-        main_font = ('Segoe UI', 10)
-        header_font = ('Segoe UI', 12, 'bold')
-        mono_font = ('Consolas', 10)
-        
         style.configure(
             'Action.TButton',
             background=self.COLORS['bg_light'],
             foreground=self.COLORS['text_bright'],
             borderwidth=0,
             focusthickness=0,
-            font=('Segoe UI', 10, 'bold'),
+            font=self.FONTS['main_bold'],
             padding=(10, 8)
         )
         style.map('Action.TButton',
@@ -98,7 +161,7 @@ class P2PChatGUI:
             background=self.COLORS['success'],
             foreground='white',
             borderwidth=0,
-            font=('Segoe UI', 10, 'bold'),
+            font=self.FONTS['main_bold'],
             padding=(10, 8)
         )
         style.map('Success.TButton',
@@ -110,7 +173,7 @@ class P2PChatGUI:
             background=self.COLORS['error'],
             foreground='white',
             borderwidth=0,
-            font=('Segoe UI', 10, 'bold'),
+            font=self.FONTS['main_bold'],
             padding=(10, 8)
         )
         style.map('Danger.TButton',
@@ -121,36 +184,42 @@ class P2PChatGUI:
             'Header.TLabel',
             background=self.COLORS['bg_dark'],
             foreground=self.COLORS['text_bright'],
-            font=header_font
+            font=self.FONTS['header']
         )
         
         style.configure(
             'Info.TLabel',
             background=self.COLORS['bg_dark'],
             foreground=self.COLORS['text'],
-            font=main_font
+            font=self.FONTS['main']
         )
         
         style.configure(
             'Dim.TLabel',
             background=self.COLORS['bg_dark'],
             foreground=self.COLORS['text_dim'],
-            font=('Segoe UI', 9)
+            font=self.FONTS['small']
         )
     
     def _build_ui(self):
         main_frame = tk.Frame(self.root, bg=self.COLORS['bg_dark'])
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(0, minsize=60)
+        main_frame.rowconfigure(1, weight=1)
         
         self._build_top_bar(main_frame)
         
         content_container = tk.Frame(main_frame, bg=self.COLORS['bg_dark'], bd=0, highlightthickness=0)
-        content_container.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        content_container.grid(row=1, column=0, sticky='nsew', pady=(10, 0))
         
         self.canvas = tk.Canvas(content_container, bg=self.COLORS['bg_dark'], highlightthickness=0, bd=0)
         self.scrollbar = ttk.Scrollbar(content_container, orient="vertical", command=self.canvas.yview)
         
         self.scrollable_frame = tk.Frame(self.canvas, bg=self.COLORS['bg_dark'])
+        self.scrollable_frame.columnconfigure(0, minsize=350)
+        self.scrollable_frame.columnconfigure(1, weight=1)
+        self.scrollable_frame.rowconfigure(0, weight=1)
         
         self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
         
@@ -160,51 +229,78 @@ class P2PChatGUI:
         
         self.scrollable_frame.bind("<Configure>", self._on_frame_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         
         self._build_left_panel(self.scrollable_frame)
         
         self._build_chat_panel(self.scrollable_frame)
 
     def _on_frame_configure(self, event=None):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self._check_scroll_necessity()
+        self._schedule_scroll_update()
 
     def _on_canvas_configure(self, event=None):
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
-        self._check_scroll_necessity()
+        width, height = self._canvas_window_size
+        if event.width != width:
+            self.canvas.itemconfig(self.canvas_window, width=event.width)
+            self._canvas_window_size = (event.width, height)
+        self._schedule_scroll_update()
+
+    def _schedule_scroll_update(self):
+        if not self._scroll_dirty:
+            self._scroll_dirty = True
+            self.root.after(self.SCROLL_UPDATE_MS, self._apply_scroll_update)
+
+    def _apply_scroll_update(self):
+        self._scroll_dirty = False
+        bbox = self.canvas.bbox("all")
+        self.canvas.configure(scrollregion=bbox)
+        self._check_scroll_necessity(bbox)
 
-    def _check_scroll_necessity(self):
+    def _check_scroll_necessity(self, bbox=None):
         canvas_height = self.canvas.winfo_height()
-        _, _, _, req_height = self.canvas.bbox("all") or (0,0,0,0)
+        if bbox is None:
+            bbox = self.canvas.bbox("all")
+        _, _, _, req_height = bbox or (0,0,0,0)
         
         if req_height > canvas_height and canvas_height > 10:
-            if not self.scrollbar.winfo_ismapped():
+            if not self._scrollbar_visible:
+                self._scrollbar_visible = True
                 self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-                self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         else:
-            if self.scrollbar.winfo_ismapped():
+            if self._scrollbar_visible:
+                self._scrollbar_visible = False
                 self.scrollbar.pack_forget()
-                self.canvas.unbind_all("<MouseWheel>")
                 self.canvas.yview_moveto(0)
             
-            if canvas_height > 1:
+            width, height = self._canvas_window_size
+            if canvas_height > 1 and canvas_height != height:
                 self.canvas.itemconfig(self.canvas_window, height=canvas_height)
+                self._canvas_window_size = (width, canvas_height)
 
     def _on_mousewheel(self, event):
-        if self.scrollbar.winfo_ismapped():
-            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        if not self._scrollbar_visible:
+            return
+        self._wheel_accum += int(-1*(event.delta/120))
+        if not self._wheel_pending:
+            self._wheel_pending = True
+            self.root.after_idle(self._flush_wheel)
+
+    def _flush_wheel(self):
+        self._wheel_pending = False
+        units, self._wheel_accum = self._wheel_accum, 0
+        if units and self._scrollbar_visible:
+            self.canvas.yview_scroll(units, "units")
     
     def _build_top_bar(self, parent):
-        top_frame = tk.Frame(parent, bg=self.COLORS['bg_medium'], height=60)
-        top_frame.pack(fill=tk.X)
-        top_frame.pack_propagate(False)
+        top_frame = tk.Frame(parent, bg=self.COLORS['bg_medium'])
+        top_frame.grid(row=0, column=0, sticky='nsew')
         
         title_label = tk.Label(
             top_frame,
             text="P2P COMMUNICATION",
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['text_bright'],
-            font=('Segoe UI', 14, 'bold')
+            font=self.FONTS['title']
         )
         title_label.pack(side=tk.LEFT, padx=15, pady=15)
         
@@ -216,14 +312,14 @@ class P2PChatGUI:
             text="IP:",
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['accent'],
-            font=('Segoe UI', 10, 'bold')
+            font=self.FONTS['main_bold']
         ).pack(side=tk.LEFT)
         
         self.ip_display = tk.Entry(
             info_frame,
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['accent'],
-            font=('Segoe UI', 10, 'bold'),
+            font=self.FONTS['main_bold'],
             bd=0,
             readonlybackground=self.COLORS['bg_medium'],
             width=15
@@ -237,14 +333,14 @@ class P2PChatGUI:
             text="PORT:",
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['warning'],
-            font=('Segoe UI', 10, 'bold')
+            font=self.FONTS['main_bold']
         ).pack(side=tk.LEFT)
         
         self.port_display = tk.Entry(
             info_frame,
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['warning'],
-            font=('Segoe UI', 10, 'bold'),
+            font=self.FONTS['main_bold'],
             bd=0,
             readonlybackground=self.COLORS['bg_medium'],
             width=6
@@ -258,13 +354,13 @@ class P2PChatGUI:
             text=f"👤 {self.username.upper()}",
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['success'],
-            font=('Segoe UI', 10, 'bold')
+            font=self.FONTS['main_bold']
         )
         user_label.pack(side=tk.LEFT, padx=10)
     
     def _build_left_panel(self, parent):
-        left_frame = tk.Frame(parent, bg=self.COLORS['bg_dark'], width=340)
-        left_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+        left_frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
+        left_frame.grid(row=0, column=0, sticky='nsew', padx=(0, 10))
         left_frame.pack_propagate(False)
         
         discovery_frame = tk.LabelFrame(
@@ -272,7 +368,7 @@ class P2PChatGUI:
             text=" NETWORK DISCOVERY ",
             bg=self.COLORS['bg_dark'],
             fg=self.COLORS['text_dim'],
-            font=('Segoe UI', 9, 'bold'),
+            font=self.FONTS['small_bold'],
             bd=1,
             relief=tk.FLAT
         )
@@ -299,7 +395,7 @@ class P2PChatGUI:
             text="FOUND PEERS",
             bg=self.COLORS['bg_dark'],
             fg=self.COLORS['text_dim'],
-            font=('Segoe UI', 9, 'bold'),
+            font=self.FONTS['small_bold'],
             anchor='w'
         ).pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 5))
         
@@ -313,7 +409,7 @@ class P2PChatGUI:
             discovered_list_frame,
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['text_bright'],
-            font=('Segoe UI', 10),
+            font=self.FONTS['main'],
             selectbackground=self.COLORS['accent'],
             bd=0,
             highlightthickness=1,
@@ -329,7 +425,7 @@ class P2PChatGUI:
             text=" CONNECTED PEERS ",
             bg=self.COLORS['bg_dark'],
             fg=self.COLORS['text_dim'],
-            font=('Segoe UI', 9, 'bold'),
+            font=self.FONTS['small_bold'],
             bd=1,
             relief=tk.FLAT
         )
@@ -353,7 +449,7 @@ class P2PChatGUI:
             connected_list_frame,
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['text_bright'],
-            font=('Segoe UI', 10),
+            font=self.FONTS['main'],
             selectbackground=self.COLORS['accent'],
             bd=0,
             highlightthickness=0,
@@ -365,7 +461,7 @@ class P2PChatGUI:
     
     def _build_chat_panel(self, parent):
         chat_frame = tk.Frame(parent, bg=self.COLORS['bg_dark'])
-        chat_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        chat_frame.grid(row=0, column=1, sticky='nsew')
         
         self.pending_frame = tk.Frame(chat_frame, bg=self.COLORS['warning'])
         
@@ -374,7 +470,7 @@ class P2PChatGUI:
             text="",
             bg=self.COLORS['warning'],
             fg='black',
-            font=('Segoe UI', 10, 'bold')
+            font=self.FONTS['main_bold']
         )
         self.pending_label.pack(side=tk.LEFT, padx=10, pady=5)
         
@@ -383,7 +479,7 @@ class P2PChatGUI:
             text="ACCEPT",
             bg=self.COLORS['success'],
             fg='white',
-            font=('Segoe UI', 9, 'bold'),
+            font=self.FONTS['small_bold'],
             bd=0,
             command=self._on_accept
         )
@@ -394,7 +490,7 @@ class P2PChatGUI:
             text="REJECT",
             bg=self.COLORS['error'],
             fg='white',
-            font=('Segoe UI', 9, 'bold'),
+            font=self.FONTS['small_bold'],
             bd=0,
             command=self._on_reject
         )
@@ -405,7 +501,7 @@ class P2PChatGUI:
             text=" MESSAGES ",
             bg=self.COLORS['bg_dark'],
             fg=self.COLORS['text_dim'],
-            font=('Segoe UI', 9, 'bold'),
+            font=self.FONTS['small_bold'],
             bd=1,
             relief=tk.FLAT
         )
@@ -415,7 +511,7 @@ class P2PChatGUI:
             chat_label_frame,
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['text_bright'],
-            font=('Consolas', 10),
+            font=self.FONTS['mono'],
             wrap=tk.WORD,
             state=tk.DISABLED,
             bd=0,
@@ -436,7 +532,7 @@ class P2PChatGUI:
             input_frame,
             bg=self.COLORS['bg_medium'],
             fg=self.COLORS['text_bright'],
-            font=('Segoe UI', 11),
+            font=self.FONTS['input'],
             insertbackground=self.COLORS['text_bright'],
             bd=0,
             highlightthickness=2,
@@ -450,7 +546,7 @@ class P2PChatGUI:
             text="SEND",
             bg=self.COLORS['accent'],
             fg='white',
-            font=('Segoe UI', 10, 'bold'),
+            font=self.FONTS['main_bold'],
             bd=0,
             padx=25,
             command=lambda: self._on_send_message(None)
@@ -458,6 +554,12 @@ class P2PChatGUI:
         send_btn.pack(side=tk.RIGHT, padx=(10, 0), ipady=10)
     
     def _setup_callbacks(self):
+        self._message_handlers = {
+            MessageType.MESSAGE: self._handle_chat_message,
+            MessageType.CONNECTION_REQUEST: self._handle_conn_request,
+            MessageType.CONNECTION_ACCEPT: self._handle_conn_accept,
+            MessageType.CONNECTION_REJECT: self._handle_conn_reject,
+        }
         self.peer.connections.set_message_callback(self._on_message_received)
         self.peer.connections.set_connect_callback(self._on_peer_connected)
         self.peer.connections.set_disconnect_callback(self._on_peer_disconnected)
@@ -474,10 +576,35 @@ class P2PChatGUI:
         self.root.mainloop()
     
     def _on_close(self):
+        self._io_queue.put(None)
+        self._scan_queue.put(None)
         self.peer.discovery.stop_listening()
         self.peer.connections.stop_server()
         self.root.destroy()
     
+    def _post(self, callback, *args):
+        self._ui_queue.put((callback, args))
+    
+    def _drain_ui_queue(self):
+        self.root.after(self.UI_DRAIN_INTERVAL_MS, self._drain_ui_queue)
+        
+        for _ in range(self.UI_DRAIN_BATCH):
+            try:
+                callback, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+    
+    def _io_worker(self, jobs: queue.Queue):
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            try:
+                job()
+            except Exception as e:
+                self._post(self._log_error, f"Network operation failed: {e}")
+    
     def _on_discover(self):
         self.discover_btn.config(state=tk.DISABLED)
         self._log_system("Scanning network...")
@@ -485,18 +612,18 @@ class P2PChatGUI:
         def do_discover():
             self.peer.discovery.clear_discovered_peers()
             peers = self.peer.discovery.broadcast_discovery(timeout=3.0)
-            self.root.after(0, lambda: self._update_discovered_peers(peers))
+            self._post(self._update_discovered_peers, peers)
         
-        threading.Thread(target=do_discover, daemon=True).start()
+        self._scan_queue.put(do_discover)
     
     def _update_discovered_peers(self, peers: Set[Tuple[str, int, str]]):
         self.discover_btn.config(state=tk.NORMAL)
-        self.all_discovered_peers.update(peers)
+        for ip, port, username in peers:
+            self._add_discovered_peer(ip, port, username)
         self._filter_peers()
         
-        connected_ips = set(self.peer.connections.connected_peers)
-        filtered_peers = [p for p in peers if p[0] not in connected_ips]
-        count = len(filtered_peers)
+        is_connected = self.peer.connections.is_connected
+        count = sum(1 for p in peers if not is_connected(p[0]))
         
         if count > 0:
             self._log_system(f"Scan complete. Found {count} peer(s).")
@@ -512,23 +639,8 @@ class P2PChatGUI:
             messagebox.showwarning("Select Peer", "Please select a peer from the list")
             return
         
-        peer_str = self.discovered_listbox.get(selection[0])
-        try:
-            last_open = peer_str.rfind('[')
-            last_close = peer_str.rfind(']')
-            
-            if last_open == -1 or last_close == -1:
-                last_open = peer_str.rfind('(')
-                last_close = peer_str.rfind(')')
-                if last_open == -1 or last_close == -1:
-                    raise ValueError("Invalid format")
-            
-            ip_port = peer_str[last_open+1:last_close]
-            ip, port_str = ip_port.split(':')
-            self._connect_to_peer(ip, int(port_str))
-            
-        except Exception:
-             self._log_error(f"Could not parse peer info: {peer_str}")
+        row = self._discovered_index[selection[0]]
+        self._connect_to_peer(row.ip, row.port)
     
     def _connect_to_peer(self, ip: str, port: int):
         display_name = self._get_peer_display_name(ip, port)
@@ -537,76 +649,77 @@ class P2PChatGUI:
         def do_connect():
             success = self.peer.connections.connect_to_peer(ip, port)
             if success:
-                from .protocol import Message, MessageType
                 conn = self.peer.connections.get_connection(ip, port)
                 if conn:
                     payload = f"{self.peer.username}:{self.peer.tcp_port}"
                     req = Message(MessageType.CONNECTION_REQUEST, self.peer.local_ip, payload)
-                    conn.socket.sendall(req.to_bytes() + b'\n')
-                self.root.after(0, lambda: self._log_system(f"Connected to {display_name}, waiting for approval..."))
+                    conn.socket.sendall(req.to_framed_bytes())
+                self._post(self._log_system, f"Connected to {display_name}, waiting for approval...")
             else:
-                self.root.after(0, lambda: self._log_error(f"Could not connect to {display_name}"))
+                self._post(self._log_error, f"Could not connect to {display_name}")
         
-        threading.Thread(target=do_connect, daemon=True).start()
+        self._io_queue.put(do_connect)
     
     def _on_accept(self):
-        if self.pending_requests:
-            pending_tuple = next(iter(self.pending_requests))
-            peer_ip, peer_port, peer_username = pending_tuple
+        if self._current_pending is not None:
+            peer_ip, peer_port, peer_username = self._current_pending
+            request_port = self.pending_requests[self._current_pending]
             
             conns = self.peer.connections._connections.get(peer_ip)
             if not conns:
                 self._log_error(f"Connection not found for {peer_ip}")
-                self.pending_requests.discard(pending_tuple)
+                self._pop_pending()
                 self._update_pending_ui()
                 return
             
             conn = None
             for c in conns:
-                if not c.is_approved:
-                    mapped_port = self.ephemeral_to_listening.get((peer_ip, c.peer_port))
-                    if mapped_port == peer_port:
-                        conn = c
-                        break
-            
-            if not conn:
-                for c in conns:
-                    if not c.is_approved:
-                        conn = c
-                        break
+                if c.is_approved:
+                    continue
+                if c.peer_port == request_port:
+                    conn = c
+                    break
+                if conn is None:
+                    conn = c
             
             if not conn:
                 self._log_system("No pending connection to accept.")
-                self.pending_requests.discard(pending_tuple)
+                self._pop_pending()
                 self._update_pending_ui()
                 return
             
-            try:
-                from .protocol import Message, MessageType
-                payload = f"{self.peer.username}:{self.peer.tcp_port}"
-                accept_msg = Message(MessageType.CONNECTION_ACCEPT, self.peer.local_ip, payload)
-                conn.socket.sendall(accept_msg.to_bytes() + b'\n')
+            payload = f"{self.peer.username}:{self.peer.tcp_port}"
+            accept_frame = Message(MessageType.CONNECTION_ACCEPT, self.peer.local_ip, payload).to_framed_bytes()
+            
+            def do_accept():
+                if conn.is_approved:
+                    return
+                try:
+                    conn.socket.sendall(accept_frame)
+                except Exception as e:
+                    self._post(self._log_error, f"Could not accept connection: {e}")
+                    return
                 
                 conn.is_approved = True
-                
-                self.approved_peer_info.add((peer_ip, peer_port, peer_username))
-                
-                self._log_system(f"Accepted connection from {peer_username} [{peer_ip}:{peer_port}]")
-                
-                self.pending_requests.discard(pending_tuple)
-                    
-                self._update_pending_ui()
-                self._update_connected_list()
-            except Exception as e:
-                self._log_error(f"Could not accept connection: {e}")
+                self._post(self._on_accept_sent, peer_ip, peer_port, peer_username)
+            
+            self._io_queue.put(do_accept)
+    
+    def _on_accept_sent(self, peer_ip: str, peer_port: int, peer_username: str):
+        accepted = (peer_ip, peer_port, peer_username)
+        self._drop_pending(lambda p: p == accepted)
+        self._update_pending_ui()
+        self.approved_peer_info[(peer_ip, peer_port)] = peer_username
+        self._approved_version += 1
+        self._log_system(f"Accepted connection from {peer_username} [{peer_ip}:{peer_port}]")
+        self._update_connected_list()
     
     def _on_reject(self):
-        if self.pending_requests:
-            pending_tuple = next(iter(self.pending_requests))
-            peer_ip, peer_port, peer_username = pending_tuple
+        if self._current_pending is not None:
+            peer_ip, peer_port, peer_username = self._current_pending
             self.peer.connections.reject_connection(peer_ip)
             self._log_system(f"Rejected connection from {peer_username} [{peer_ip}:{peer_port}]")
-            self.pending_requests.discard(pending_tuple)
+            self._pop_pending()
             self._update_pending_ui()
     
     def _on_send_message(self, event):
@@ -614,70 +727,63 @@ class P2PChatGUI:
         if not content:
             return
         
-        sent_count = self.peer.connections.broadcast_message(content)
-        if sent_count > 0:
-            self._log_outgoing(content)
-        else:
-            self._log_error("No approved connections. Message not sent.")
+        def do_send():
+            sent_count = self.peer.connections.broadcast_message(content)
+            if sent_count > 0:
+                self._post(self._log_outgoing, content)
+            else:
+                self._post(self._log_error, "No approved connections. Message not sent.")
         
+        self._io_queue.put(do_send)
         self.message_entry.delete(0, tk.END)
     
     def _on_message_received(self, sender_ip: str, sender_port: int, message):
-        from .protocol import MessageType
+        handler = self._message_handlers.get(message.msg_type)
+        if handler is not None:
+            self._post(handler, sender_ip, sender_port, message)
+    
+    def _handle_chat_message(self, sender_ip: str, sender_port: int, message):
+        self._log_incoming(sender_ip, sender_port, message.payload)
+    
+    def _handle_conn_request(self, sender_ip: str, sender_port: int, message):
+        requester_name, requester_port = self._parse_user_port(message.payload)
         
-        def handle():
-            if message.msg_type == MessageType.MESSAGE:
-                self._log_incoming(sender_ip, sender_port, message.payload)
-            elif message.msg_type == MessageType.CONNECTION_REQUEST:
-                requester_name = "Unknown User"
-                requester_port = 5000
-                if message.payload and ':' in message.payload:
-                    parts = message.payload.split(':')
-                    requester_name = parts[0]
-                    try:
-                        requester_port = int(parts[1])
-                    except (ValueError, IndexError):
-                        pass
-                elif message.payload:
-                    requester_name = message.payload
-                
-                peer_info = (sender_ip, requester_port, requester_name)
-                self.all_discovered_peers = {p for p in self.all_discovered_peers if not (p[0] == sender_ip and p[1] == requester_port)}
-                self.all_discovered_peers.add(peer_info)
-                
-                self.ephemeral_to_listening[(sender_ip, sender_port)] = requester_port
-                
-                self.pending_requests.add((sender_ip, requester_port, requester_name))
-                self._update_pending_ui()
-                
-                self._log_system(f"Connection request from {requester_name} ({sender_ip}:{requester_port})")
-            elif message.msg_type == MessageType.CONNECTION_ACCEPT:
-                accepter_name = "Unknown User"
-                accepter_port = 5000
-                if message.payload and ':' in message.payload:
-                    parts = message.payload.split(':')
-                    accepter_name = parts[0]
-                    try:
-                        accepter_port = int(parts[1])
-                    except (ValueError, IndexError):
-                        pass
-                elif message.payload and message.payload not in ["CONNECTION_ACCEPTED", "REQUEST_CONNECTION"]:
-                    accepter_name = message.payload
-                
-                peer_info = (sender_ip, accepter_port, accepter_name)
-                self.all_discovered_peers = {p for p in self.all_discovered_peers if not (p[0] == sender_ip and p[1] == accepter_port)}
-                self.all_discovered_peers.add(peer_info)
-                
-                self.ephemeral_to_listening[(sender_ip, sender_port)] = accepter_port
-                
-                self.approved_peer_info.add(peer_info)
-                
-                self._log_system(f"Connection accepted by {accepter_name} [{sender_ip}:{accepter_port}]!")
-                self._update_connected_list()
-            elif message.msg_type == MessageType.CONNECTION_REJECT:
-                self._log_error(f"Connection rejected by {self._get_peer_display_name(sender_ip, sender_port)}")
+        self._add_discovered_peer(sender_ip, requester_port, requester_name)
         
-        self.root.after(0, handle)
+        self.ephemeral_to_listening[(sender_ip, sender_port)] = requester_port
+        
+        self._add_pending((sender_ip, requester_port, requester_name), sender_port)
+        self._update_pending_ui()
+        
+        self._log_system(f"Connection request from {requester_name} ({sender_ip}:{requester_port})")
+    
+    def _handle_conn_accept(self, sender_ip: str, sender_port: int, message):
+        accepter_name, accepter_port = self._parse_user_port(
+            message.payload, ("CONNECTION_ACCEPTED", "REQUEST_CONNECTION")
+        )
+        
+        self._add_discovered_peer(sender_ip, accepter_port, accepter_name)
+        
+        self.ephemeral_to_listening[(sender_ip, sender_port)] = accepter_port
+        
+        self.approved_peer_info[(sender_ip, accepter_port)] = accepter_name
+        self._approved_version += 1
+        
+        self._log_system(f"Connection accepted by {accepter_name} [{sender_ip}:{accepter_port}]!")
+        self._update_connected_list()
+    
+    def _handle_conn_reject(self, sender_ip: str, sender_port: int, message):
+        self._log_error(f"Connection rejected by {self._get_peer_display_name(sender_ip, sender_port)}")
+    
+    @staticmethod
+    def _parse_user_port(payload: str, placeholders: Tuple[str, ...] = ()) -> Tuple[str, int]:
+        name, sep, port_str = payload.rpartition(':')
+        if sep:
+            return name, int(port_str) if port_str.isdecimal() else 5000
+        
+        if payload and payload not in placeholders:
+            return payload, 5000
+        return "Unknown User", 5000
     
     def _on_peer_connected(self, peer_ip: str):
         pass
@@ -692,58 +798,162 @@ class P2PChatGUI:
             self._log_system(f"Peer disconnected: {self._get_peer_display_name(peer_ip, listening_port)}")
             
             if listening_port is not None:
-                self.approved_peer_info = {p for p in self.approved_peer_info if not (p[0] == peer_ip and p[1] == listening_port)}
-                self.pending_requests = {p for p in self.pending_requests if not (p[0] == peer_ip and p[1] == listening_port)}
+                self.approved_peer_info.pop((peer_ip, listening_port), None)
+                self._drop_pending(lambda p: p[0] == peer_ip and p[1] == listening_port)
             else:
-                self.approved_peer_info = {p for p in self.approved_peer_info if p[0] != peer_ip}
-                self.pending_requests = {p for p in self.pending_requests if p[0] != peer_ip}
+                for endpoint in [e for e in self.approved_peer_info if e[0] == peer_ip]:
+                    del self.approved_peer_info[endpoint]
+                self._drop_pending(lambda p: p[0] == peer_ip)
+            
+            self._approved_version += 1
             
             self._update_pending_ui()
             self._update_connected_list()
-            self._filter_peers()
         
-        self.root.after(0, handle)
+        self._post(handle)
+    
+    def _add_pending(self, peer_info: Tuple[str, int, str], request_port: int):
+        self.pending_requests[peer_info] = request_port
+        if self._current_pending is None:
+            self._current_pending = peer_info
+    
+    def _pop_pending(self):
+        del self.pending_requests[self._current_pending]
+        self._current_pending = next(iter(self.pending_requests), None)
+    
+    def _drop_pending(self, predicate):
+        for peer_info in [p for p in self.pending_requests if predicate(p)]:
+            del self.pending_requests[peer_info]
+        self._current_pending = next(iter(self.pending_requests), None)
     
     def _update_pending_ui(self):
-        if self.pending_requests:
-            peer_ip, peer_port, peer_username = next(iter(self.pending_requests))
-            peer_display = f"{peer_username} [{peer_ip}:{peer_port}]"
+        if not self._pending_dirty:
+            self._pending_dirty = True
+            self.root.after_idle(self._flush_pending_ui)
+    
+    def _flush_pending_ui(self):
+        self._pending_dirty = False
+        if self._current_pending == self._pending_rendered:
+            return
+        self._pending_rendered = self._current_pending
+        
+        if self._current_pending is not None:
+            peer_display = self._peer_row(*self._current_pending).label
             self.pending_label.config(text=f"⚠ {peer_display} wants to connect")
             self.pending_frame.pack(fill=tk.X, pady=(0, 5))
         else:
             self.pending_frame.pack_forget()
     
     def _update_connected_list(self):
-        self.connected_listbox.delete(0, tk.END)
-        
-        for ip, port, username in self.approved_peer_info:
-            display_text = f"{username} [{ip}:{port}]"
-            self.connected_listbox.insert(tk.END, display_text)
+        if not self._connected_dirty:
+            self._connected_dirty = True
+            self.root.after_idle(self._flush_connected_list)
+    
+    def _flush_connected_list(self):
+        self._connected_dirty = False
+        if self._connected_version == self._approved_version:
+            return
+        self._connected_version = self._approved_version
+        rows = self._connected_rows
+        listbox = self.connected_listbox
+        approved = self.approved_peer_info
+        
+        for index in range(len(rows) - 1, -1, -1):
+            row = rows[index]
+            if approved.get((row.ip, row.port)) != row.username:
+                listbox.delete(index)
+                del rows[index]
+        
+        shown = set(rows)
+        added = []
+        for (ip, port), username in approved.items():
+            row = self._peer_row(ip, port, username)
+            if row not in shown:
+                added.append(row)
+        if added:
+            listbox.insert(tk.END, *(row.label for row in added))
+            rows.extend(added)
         
         self._filter_peers()
     
     def _log_message(self, text: str, tag: str = None):
+        self._log_queue.append((text, tag))
+        self._ensure_flush_scheduled()
+    
+    def _ensure_flush_scheduled(self):
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.root.after_idle(self._flush_log)
+    
+    def _flush_log(self):
+        self._log_flush_scheduled = False
+        if not self._log_queue:
+            return
+        
+        chunks = []
+        lines = []
+        current_tag = None
+        while self._log_queue:
+            text, tag = self._log_queue.popleft()
+            tag = tag or ""
+            if lines and tag != current_tag:
+                chunks.append("".join(lines))
+                chunks.append(current_tag)
+                lines = []
+            current_tag = tag
+            lines.append(text + "\n")
+        chunks.append("".join(lines))
+        chunks.append(current_tag)
+        
+        at_bottom = self.chat_display.yview()[1] >= 0.98
+        
         self.chat_display.config(state=tk.NORMAL)
-        if tag:
-            self.chat_display.insert(tk.END, text + "\n", tag)
-        else:
-            self.chat_display.insert(tk.END, text + "\n")
-        self.chat_display.see(tk.END)
+        self.chat_display.insert(tk.END, *chunks)
+        
+        line_count = int(self.chat_display.index('end-1c').split('.')[0])
+        if line_count > self.MAX_CHAT_LINES + self.CHAT_TRIM_SLACK:
+            self.chat_display.delete('1.0', f"{line_count - self.MAX_CHAT_LINES}.0")
+        
+        if at_bottom:
+            self.chat_display.see(tk.END)
         self.chat_display.config(state=tk.DISABLED)
     
     def _log_system(self, text: str):
         self._log_message(f"[SYSTEM] {text}", 'system')
     
+    def _peer_row(self, ip: str, port: int, username: str) -> PeerRow:
+        row = self.all_discovered_peers.get((ip, port))
+        if row is None or row.username != username:
+            row = PeerRow(ip, port, username, f"{username} [{ip}:{port}]")
+        return row
+    
+    def _add_discovered_peer(self, ip: str, port: int, username: str):
+        row = self.all_discovered_peers.get((ip, port))
+        if row is not None and row.username == username:
+            return
+        self.all_discovered_peers[(ip, port)] = PeerRow(ip, port, username, f"{username} [{ip}:{port}]")
+        self._peer_by_ip.setdefault(ip, port)
+        self._discovered_version += 1
+        self._display_name_cache.clear()
+    
     def _get_peer_display_name(self, ip: str, port: int = None) -> str:
+        key = (ip, port)
+        display_name = self._display_name_cache.get(key)
+        if display_name is None:
+            display_name = self._resolve_display_name(ip, port)
+            self._display_name_cache[key] = display_name
+        return display_name
+    
+    def _resolve_display_name(self, ip: str, port: int = None) -> str:
         if port is not None:
-             for peer_ip, peer_port, username in self.all_discovered_peers:
-                 if peer_ip == ip and peer_port == port:
-                     return f"{username} [{ip}:{port}]"
-                     
-        for peer_ip, peer_port, username in self.all_discovered_peers:
-            if peer_ip == ip:
-                return f"{username} [{ip}:{peer_port}]"
-        return f"[{ip}]"
+            row = self.all_discovered_peers.get((ip, port))
+            if row is not None:
+                return row.label
+        
+        peer_port = self._peer_by_ip.get(ip)
+        if peer_port is None:
+            return f"[{ip}]"
+        return self.all_discovered_peers[(ip, peer_port)].label
 
     def _log_incoming(self, sender_ip: str, sender_port: int, text: str):
         listening_port = self.ephemeral_to_listening.get((sender_ip, sender_port), sender_port)
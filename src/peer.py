@@ -1,14 +1,12 @@
 import socket
 import logging
-from typing import Optional
+import time
+from typing import Optional, Set, Tuple
 
-from .discovery import PeerDiscovery
-from .connection import ConnectionManager
 from .discovery import PeerDiscovery
 from .connection import ConnectionManager
 from .protocol import Message, MessageType
 from .cli import ChatCLI, CommandType
-from .cli import ChatCLI, CommandType
 
 logging.basicConfig(
     level=logging.WARNING,
@@ -17,12 +15,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+_local_ip: Optional[str] = None
+
+
 def get_local_ip() -> str:
+    global _local_ip
+    if _local_ip is not None:
+        return _local_ip
+    
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
         local_ip = s.getsockname()[0]
         s.close()
+        _local_ip = local_ip
         return local_ip
     except Exception:
         return "127.0.0.1"
@@ -30,6 +36,8 @@ def get_local_ip() -> str:
 
 class Peer:
     
+    DISCOVER_CACHE_SECONDS = 3.0
+    
     def __init__(
         self,
         tcp_port: int = 5000,
@@ -40,6 +48,7 @@ class Peer:
         self.tcp_port = tcp_port
         self.broadcast_port = broadcast_port
         self.username = username
+        self._last_discover: Optional[Tuple[float, Set[Tuple[str, int, str]]]] = None
         
         self.discovery = PeerDiscovery(
             local_ip=self.local_ip,
@@ -61,17 +70,26 @@ class Peer:
         self._setup_callbacks()
     
     def _setup_callbacks(self) -> None:
+        self._message_handlers = {
+            MessageType.MESSAGE: self._on_chat_message,
+            MessageType.CONNECTION_REQUEST: self._on_connection_request,
+            MessageType.CONNECTION_ACCEPT: self._on_connection_accept,
+            MessageType.CONNECTION_REJECT: self._on_connection_reject,
+        }
+        
         self.connections.set_message_callback(self._on_message_received)
         self.connections.set_connect_callback(self._on_peer_connected)
         self.connections.set_disconnect_callback(self._on_peer_disconnected)
         
-        self.cli.register_handler(CommandType.DISCOVER, self._handle_discover)
-        self.cli.register_handler(CommandType.CONNECT, self._handle_connect)
-        self.cli.register_handler(CommandType.DISCONNECT, self._handle_disconnect)
-        self.cli.register_handler(CommandType.LIST, self._handle_list)
-        self.cli.register_handler(CommandType.MESSAGE, self._handle_message)
-        self.cli.register_handler(CommandType.ACCEPT, self._handle_accept)
-        self.cli.register_handler(CommandType.REJECT, self._handle_reject)
+        self.cli.register_handlers({
+            CommandType.DISCOVER: self._handle_discover,
+            CommandType.CONNECT: self._handle_connect,
+            CommandType.DISCONNECT: self._handle_disconnect,
+            CommandType.LIST: self._handle_list,
+            CommandType.MESSAGE: self._handle_message,
+            CommandType.ACCEPT: self._handle_accept,
+            CommandType.REJECT: self._handle_reject,
+        })
     
     def start(self) -> None:
         logger.info(f"Starting P2P Chat on {self.local_ip}:{self.tcp_port}")
@@ -93,16 +111,22 @@ class Peer:
         self.connections.stop_server()
     
     def _handle_discover(self, args: list) -> None:
-        self.cli.print_discovery("Broadcasting on LAN...")
-        
-        self.discovery.clear_discovered_peers()
-        
-        peers = self.discovery.broadcast_discovery(timeout=3.0)
+        last_discover = self._last_discover
+        if last_discover is not None and time.monotonic() - last_discover[0] < self.DISCOVER_CACHE_SECONDS:
+            self.cli.print_discovery("(using cached result)")
+            peers = last_discover[1]
+        else:
+            self.cli.print_discovery("Broadcasting on LAN...")
+            
+            self.discovery.clear_discovered_peers()
+            
+            peers = self.discovery.broadcast_discovery(timeout=3.0)
+            self._last_discover = (time.monotonic(), peers)
         
         if peers:
-            self.cli.print_discovery(f"Found {len(peers)} peer(s):")
-            for ip, port in peers:
-                self.cli.print_discovery(f"  - {ip}:{port}")
+            self.cli.print_discovery_lines(
+                [f"Found {len(peers)} peer(s):"] + [f"  - {ip}:{port}" for ip, port, _ in peers]
+            )
         else:
             self.cli.print_discovery("No peers found on the network.")
     
@@ -136,8 +160,7 @@ class Peer:
         
         peer_ip = args[0]
         
-        if peer_ip in self.connections.connected_peers:
-            self.connections.disconnect_peer(peer_ip)
+        if self.connections.disconnect_peer(peer_ip):
             self.cli.print_success(f"Disconnected from {peer_ip}")
         else:
             self.cli.print_error(f"Not connected to {peer_ip}")
@@ -146,9 +169,9 @@ class Peer:
         peers = self.connections.connected_peers
         
         if peers:
-            self.cli.print_system(f"Connected peers ({len(peers)}):")
-            for peer_ip in peers:
-                self.cli.print_system(f"  - {peer_ip}")
+            self.cli.print_system_lines(
+                [f"Connected peers ({len(peers)}):"] + [f"  - {peer_ip}" for peer_ip in peers]
+            )
         else:
             self.cli.print_system("No connected peers.")
     
@@ -191,17 +214,21 @@ class Peer:
         self.cli.print_success(f"Rejected connection from {peer_ip}")
     
     def _on_message_received(self, sender_ip: str, sender_port: int, message: Message) -> None:
-        if message.msg_type == MessageType.MESSAGE:
-            self.cli.print_incoming_message(sender_ip, message.payload)
-            
-        elif message.msg_type == MessageType.CONNECTION_REQUEST:
-            self.cli.print_system(f"{sender_ip} wants to connect. Type '/accept {sender_ip}' or '/reject {sender_ip}'")
-            
-        elif message.msg_type == MessageType.CONNECTION_ACCEPT:
-            self.cli.print_success(f"Connection accepted by {sender_ip}. You can now chat!")
-            
-        elif message.msg_type == MessageType.CONNECTION_REJECT:
-            self.cli.print_error(f"Connection rejected by {sender_ip}.")
+        handler = self._message_handlers.get(message.msg_type)
+        if handler is not None:
+            handler(sender_ip, message)
+    
+    def _on_chat_message(self, sender_ip: str, message: Message) -> None:
+        self.cli.print_incoming_message(sender_ip, message.payload)
+    
+    def _on_connection_request(self, sender_ip: str, message: Message) -> None:
+        self.cli.print_system(f"{sender_ip} wants to connect. Type '/accept {sender_ip}' or '/reject {sender_ip}'")
+    
+    def _on_connection_accept(self, sender_ip: str, message: Message) -> None:
+        self.cli.print_success(f"Connection accepted by {sender_ip}. You can now chat!")
+    
+    def _on_connection_reject(self, sender_ip: str, message: Message) -> None:
+        self.cli.print_error(f"Connection rejected by {sender_ip}.")
     
     def _on_peer_connected(self, peer_ip: str) -> None:
         self.cli.print_connection(f"Peer connected: {peer_ip}")
@@ -1,4 +1,6 @@
 import json
+import sys
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Optional, Dict, Any
@@ -6,6 +8,25 @@ from typing import Optional, Dict, Any
 from .crypto import encode_message, decode_message
 
 
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+_ENCODED_CONTROL_PAYLOADS = {
+    payload: encode_message(payload)
+    for payload in ("GOODBYE", "REQUEST_CONNECTION", "CONNECTION_ACCEPTED", "CONNECTION_REJECTED")
+}
+_DECODED_CONTROL_PAYLOADS = {encoded: payload for payload, encoded in _ENCODED_CONTROL_PAYLOADS.items()}
+
+_last_timestamp = (0, "")
+
+
+def _current_timestamp() -> str:
+    global _last_timestamp
+    second = int(time.time())
+    if second != _last_timestamp[0]:
+        _last_timestamp = (second, datetime.fromtimestamp(second).isoformat())
+    return _last_timestamp[1]
+
+
 class MessageType(Enum):
     DISCOVERY = "discovery"
     DISCOVERY_RESPONSE = "discovery_response"
@@ -16,8 +37,14 @@ class MessageType(Enum):
     CONNECTION_REJECT = "connection_reject"
 
 
+_TYPE_LOOKUP: Dict[str, MessageType] = {m.value: m for m in MessageType}
+_REQUIRED_FIELDS = ("type", "sender")
+
+
 class Message:
     
+    __slots__ = ('msg_type', 'sender', 'payload', 'timestamp')
+    
     def __init__(
         self,
         msg_type: MessageType,
@@ -28,10 +55,12 @@ class Message:
         self.msg_type = msg_type
         self.sender = sender
         self.payload = payload
-        self.timestamp = timestamp or datetime.now().isoformat()
+        self.timestamp = timestamp or _current_timestamp()
     
     def to_json(self) -> str:
-        encrypted_payload = encode_message(self.payload) if self.payload else ""
+        encrypted_payload = _ENCODED_CONTROL_PAYLOADS.get(self.payload)
+        if encrypted_payload is None:
+            encrypted_payload = encode_message(self.payload) if self.payload else ""
         
         data = {
             "type": self.msg_type.value,
@@ -39,40 +68,45 @@ class Message:
             "payload": encrypted_payload,
             "timestamp": self.timestamp
         }
-        return json.dumps(data)
+        return _JSON_ENCODER.encode(data)
     
     def to_bytes(self) -> bytes:
         return self.to_json().encode('utf-8')
     
+    def to_framed_bytes(self) -> bytes:
+        return (self.to_json() + '\n').encode('utf-8')
+    
     @classmethod
     def from_json(cls, json_str: str) -> 'Message':
         try:
             data = json.loads(json_str)
-            
-            required_fields = ["type", "sender"]
-            for field in required_fields:
-                if field not in data:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            try:
-                msg_type = MessageType(data["type"])
-            except ValueError:
-                raise ValueError(f"Unknown message type: {data['type']}")
-            
-            encrypted_payload = data.get("payload", "")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        
+        for field in _REQUIRED_FIELDS:
+            if field not in data:
+                raise ValueError(f"Missing required field: {field}")
+        
+        type_value = data["type"]
+        msg_type = _TYPE_LOOKUP.get(type_value) if isinstance(type_value, str) else None
+        if msg_type is None:
+            raise ValueError(f"Unknown message type: {type_value}")
+        
+        encrypted_payload = data.get("payload", "")
+        decrypted_payload = _DECODED_CONTROL_PAYLOADS.get(encrypted_payload)
+        if decrypted_payload is None:
             try:
                 decrypted_payload = decode_message(encrypted_payload) if encrypted_payload else ""
             except ValueError:
                 decrypted_payload = encrypted_payload
-            
-            return cls(
-                msg_type=msg_type,
-                sender=data["sender"],
-                payload=decrypted_payload,
-                timestamp=data.get("timestamp")
-            )
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON: {e}")
+        
+        sender = data["sender"]
+        return cls(
+            msg_type=msg_type,
+            sender=sys.intern(sender) if isinstance(sender, str) else sender,
+            payload=decrypted_payload,
+            timestamp=data.get("timestamp")
+        )
     
     @classmethod
     def from_bytes(cls, data: bytes) -> 'Message':
@@ -1,9 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import os
+import queue
 import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_BG = '#121212'
+_FG = '#d4d4d4'
+_ACCENT = '#007acc'
+_INPUT_BG = '#1e1e1e'
+
+_FONT_TITLE = ('Segoe UI', 20, 'bold')
+_FONT_SUBTITLE = ('Segoe UI', 10)
+_FONT_LABEL = ('Segoe UI', 9, 'bold')
+_FONT_BODY = ('Segoe UI', 11)
+_FONT_BUTTON = ('Segoe UI', 11, 'bold')
+
+_LABEL_OPTS = {'font': _FONT_LABEL, 'bg': _BG, 'fg': _FG}
+
+_warn = messagebox.showwarning
+_err = messagebox.showerror
 
 class StartupDialog:
     
+    PORT_CHECK_TTL = 2.0
+    UI_DRAIN_INTERVAL_MS = 16
+    PORT_SCAN_RANGE = range(5000, 5100)
+    PORT_SCAN_WORKERS = 16
+    PORT_CHOICES = 11
+    _DEFAULT_PORTS = tuple(str(p) for p in range(5000, 5000 + PORT_CHOICES))
+    
     def __init__(self):
         self.result = None
         self.root = tk.Tk()
@@ -11,43 +39,105 @@ class StartupDialog:
         self.root.geometry("400x450")
         self.root.resizable(False, False)
         
-        self.bg_color = '#121212'
-        self.fg_color = '#d4d4d4'
-        self.accent_color = '#007acc'
-        self.input_bg = '#1e1e1e'
-        
-        self.root.configure(bg=self.bg_color)
+        self.root.configure(bg=_BG)
         
         style = ttk.Style()
         style.theme_use('clam')
         style.configure(
             'TCombobox', 
-            fieldbackground=self.input_bg,
-            background=self.bg_color,
+            fieldbackground=_INPUT_BG,
+            background=_BG,
             foreground='white',
             arrowcolor='white',
-            bordercolor=self.input_bg,
-            selectbackground=self.accent_color,
+            bordercolor=_INPUT_BG,
+            selectbackground=_ACCENT,
             selectforeground='white'
         )
         
         style.map('TCombobox', 
-            fieldbackground=[('readonly', self.input_bg)],
-            selectbackground=[('readonly', self.input_bg)],
+            fieldbackground=[('readonly', _INPUT_BG)],
+            selectbackground=[('readonly', _INPUT_BG)],
             selectforeground=[('readonly', 'white')],
             foreground=[('readonly', 'white')]
         )
-        self.root.option_add('*TCombobox*Listbox.background', self.input_bg)
+        self.root.option_add('*TCombobox*Listbox.background', _INPUT_BG)
         self.root.option_add('*TCombobox*Listbox.foreground', 'white')
-        self.root.option_add('*TCombobox*Listbox.selectBackground', self.accent_color)
+        self.root.option_add('*TCombobox*Listbox.selectBackground', _ACCENT)
         self.root.option_add('*TCombobox*Listbox.selectForeground', 'white')
-        self.root.option_add('*TCombobox*Listbox.font', ('Segoe UI', 10))
+        self.root.option_add('*TCombobox*Listbox.font', _FONT_SUBTITLE)
         
+        self._port_checks = {}
+        self._ui_queue = queue.SimpleQueue()
+        self._closed = False
         self._build_ui()
         
+        threading.Thread(
+            target=self._scan_free_ports,
+            args=(self.PORT_SCAN_RANGE,),
+            daemon=True
+        ).start()
+        self.root.after(self.UI_DRAIN_INTERVAL_MS, self._drain_ui_queue)
+        
+    def _post(self, callback, *args):
+        self._ui_queue.put((callback, args))
+        
+    def _drain_ui_queue(self):
+        while not self._closed:
+            try:
+                callback, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                self.root.after(self.UI_DRAIN_INTERVAL_MS, self._drain_ui_queue)
+                return
+            callback(*args)
+        
+    def _scan_free_ports(self, ports):
+        with ThreadPoolExecutor(max_workers=self.PORT_SCAN_WORKERS) as executor:
+            free = executor.map(self._is_port_free, ports)
+            free_ports = [str(port) for port, is_free in zip(ports, free) if is_free]
+        del free_ports[self.PORT_CHOICES:]
+        self._post(self._apply_free_ports, free_ports)
+        
+    def _apply_free_ports(self, free_ports):
+        selected = self.port_combo.get()
+        if selected.isdecimal() and selected not in free_ports:
+            checked = self._port_checks.get(int(selected))
+            if checked is None or checked[1]:
+                free_ports = sorted(free_ports + [selected], key=int)
+        
+        if not free_ports:
+            return
+        
+        self.port_combo.configure(values=free_ports)
+        if selected in free_ports:
+            self.port_combo.current(free_ports.index(selected))
+        else:
+            self.port_combo.current(0)
+        
     def _is_port_free(self, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(('localhost', port)) != 0
+        now = time.monotonic()
+        cached = self._port_checks.get(port)
+        if cached is not None and now - cached[0] < self.PORT_CHECK_TTL:
+            return cached[1]
+        
+        is_free = self._probe_port(port)
+        self._port_checks[port] = (now, is_free)
+        return is_free
+        
+    def _probe_port(self, port):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(0.25)
+        try:
+            if os.name == 'nt':
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            else:
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind(('', port))
+            s.listen(1)
+            return True
+        except (OSError, OverflowError):
+            return False
+        finally:
+            s.close()
         
     def _build_ui(self):
         self.root.eval('tk::PlaceWindow . center')
@@ -55,36 +145,30 @@ class StartupDialog:
         title_lbl = tk.Label(
             self.root, 
             text="WELCOME", 
-            font=('Segoe UI', 20, 'bold'),
-            bg=self.bg_color,
-            fg=self.accent_color
+            font=_FONT_TITLE,
+            bg=_BG,
+            fg=_ACCENT
         )
         title_lbl.pack(pady=(40, 10))
         
         subtitle_lbl = tk.Label(
             self.root, 
             text="Configure your session", 
-            font=('Segoe UI', 10),
-            bg=self.bg_color,
+            font=_FONT_SUBTITLE,
+            bg=_BG,
             fg='#858585'
         )
         subtitle_lbl.pack(pady=(0, 30))
         
-        form_frame = tk.Frame(self.root, bg=self.bg_color)
+        form_frame = tk.Frame(self.root, bg=_BG)
         form_frame.pack(fill=tk.X, padx=40)
         
-        tk.Label(
-            form_frame, 
-            text="USERNAME *", 
-            font=('Segoe UI', 9, 'bold'),
-            bg=self.bg_color,
-            fg=self.fg_color
-        ).pack(anchor=tk.W, pady=(0, 5))
+        tk.Label(form_frame, text="USERNAME *", **_LABEL_OPTS).pack(anchor=tk.W, pady=(0, 5))
         
         self.username_entry = tk.Entry(
             form_frame,
-            font=('Segoe UI', 11),
-            bg=self.input_bg,
+            font=_FONT_BODY,
+            bg=_INPUT_BG,
             fg='white',
             insertbackground='white',
             relief=tk.FLAT,
@@ -93,32 +177,23 @@ class StartupDialog:
         self.username_entry.pack(fill=tk.X, pady=(0, 20), ipady=3)
         self.username_entry.focus()
         
-        tk.Label(
-            form_frame, 
-            text="PORT", 
-            font=('Segoe UI', 9, 'bold'),
-            bg=self.bg_color,
-            fg=self.fg_color
-        ).pack(anchor=tk.W, pady=(0, 5))
-        
-        available_ports = [str(p) for p in range(5000, 5011)]
+        tk.Label(form_frame, text="PORT", **_LABEL_OPTS).pack(anchor=tk.W, pady=(0, 5))
         
         self.port_combo = ttk.Combobox(
             form_frame,
-            values=available_ports,
-            font=('Segoe UI', 11),
+            values=self._DEFAULT_PORTS,
+            font=_FONT_BODY,
             state="readonly"
         )
-        if available_ports:
-            self.port_combo.current(0)
+        self.port_combo.current(0)
             
         self.port_combo.pack(fill=tk.X, pady=(0, 30), ipady=3)
         
-        start_btn = tk.Button(
+        self.start_btn = tk.Button(
             self.root,
             text="START SESSION",
-            font=('Segoe UI', 11, 'bold'),
-            bg=self.accent_color,
+            font=_FONT_BUTTON,
+            bg=_ACCENT,
             fg='white',
             activebackground='#0098ff',
             activeforeground='white',
@@ -126,34 +201,51 @@ class StartupDialog:
             cursor='hand2',
             command=self._on_start
         )
-        start_btn.pack(fill=tk.X, padx=40, ipady=10)
+        self.start_btn.pack(fill=tk.X, padx=40, ipady=10)
         
         self.root.bind('<Return>', lambda e: self._on_start())
         
     def _on_start(self):
+        if str(self.start_btn['state']) == tk.DISABLED:
+            return
+        
         username = self.username_entry.get().strip()
         port_str = self.port_combo.get().strip()
         
         if not username:
-             messagebox.showwarning("Required", "Username is required to continue.")
+             _warn("Required", "Username is required to continue.")
              self.username_entry.focus()
              return
         
         if len(username) > 12:
-             messagebox.showwarning("Username Too Long", "Username must be 12 characters or less.\nCurrent length: " + str(len(username)))
+             _warn("Username Too Long", "Username must be 12 characters or less.\nCurrent length: " + str(len(username)))
              self.username_entry.focus()
              return
             
         try:
             port = int(port_str)
-            if not self._is_port_free(port):
-                messagebox.showerror("Port Busy", f"Port {port} is already in use.\nPlease select another port.")
-                return
         except ValueError:
-             messagebox.showerror("Invalid Port", "Please select a valid port.")
+             _err("Invalid Port", "Please select a valid port.")
              return
+        
+        self.start_btn.configure(state=tk.DISABLED)
+        threading.Thread(
+            target=self._probe_and_finish,
+            args=(username, port),
+            daemon=True
+        ).start()
+        
+    def _probe_and_finish(self, username, port):
+        self._post(self._finish_or_error, username, port, self._is_port_free(port))
+        
+    def _finish_or_error(self, username, port, is_free):
+        if not is_free:
+            self.start_btn.configure(state=tk.NORMAL)
+            _err("Port Busy", f"Port {port} is already in use.\nPlease select another port.")
+            return
              
         self.result = {'username': username, 'port': port}
+        self._closed = True
         self.root.destroy()
         
     def run(self):